@@ -0,0 +1,70 @@
+"""Numeric kernels for :mod:`music_analyzer`.
+
+The kernels are compiled with :func:`numba.njit` when numba is installed
+(librosa already depends on it) and fall back to equivalent NumPy code
+otherwise, so the analyser keeps working without the JIT.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Tuple
+
+import numpy as np
+
+try:  # pragma: no cover - depends on the environment
+    import numba
+except ImportError:  # pragma: no cover - depends on the environment
+    numba = None
+
+
+def _silence_runs_numpy(mask: Any) -> Tuple[Any, Any]:
+    """Return ``(starts, ends)`` frame indices of the ``True`` runs in ``mask``."""
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def _silence_runs_loop(mask: Any) -> Tuple[Any, Any]:
+    """Single-pass equivalent of :func:`_silence_runs_numpy` for numba."""
+
+    n = mask.shape[0]
+    starts = np.empty(n // 2 + 1, dtype=np.int64)
+    ends = np.empty(n // 2 + 1, dtype=np.int64)
+    count = 0
+    in_run = False
+    for i in range(n):
+        if mask[i]:
+            if not in_run:
+                starts[count] = i
+                in_run = True
+        elif in_run:
+            ends[count] = i
+            count += 1
+            in_run = False
+    if in_run:
+        ends[count] = n
+        count += 1
+    return starts[:count], ends[:count]
+
+
+if numba is not None:
+    _silence_runs = numba.njit(cache=True)(_silence_runs_loop)
+else:
+    _silence_runs = _silence_runs_numpy
+
+
+def silence_runs(mask: Any) -> Tuple[Any, Any]:
+    """Locate the runs of ``True`` in a boolean frame mask.
+
+    Parameters
+    ----------
+    mask : array_like of bool
+        One flag per frame.
+
+    Returns
+    -------
+    starts, ends : numpy.ndarray
+        Start (inclusive) and end (exclusive) frame index of every run.
+    """
+
+    return _silence_runs(np.ascontiguousarray(mask, dtype=np.bool_))
@@ -1,21 +1,92 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import queue
 import os
 import json
+import math
+import importlib.util
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 
 # Importar el analizador de música (asumiendo que está en el mismo directorio)
 try:
-    from music_analyzer import MusicAnalyzer
+    from music_analyzer import MusicAnalyzer, HOP_LENGTH, _get_librosa
     ANALYZER_AVAILABLE = True
 except ImportError:
     ANALYZER_AVAILABLE = False
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 
+# matplotlib tarda en importarse: se carga la primera vez que se usa (librosa
+# se obtiene de music_analyzer._get_librosa, también bajo demanda)
+Figure = None
+FigureCanvasTkAgg = None
+
+
+def _mpl():
+    """Importar matplotlib (con backend Tk) bajo demanda"""
+    global Figure, FigureCanvasTkAgg
+    if Figure is None:
+        # Figure directamente (sin pyplot): la figura no queda registrada en el
+        # estado global de pyplot y se libera junto con la ventana
+        from matplotlib.figure import Figure as figure_cls
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as canvas_cls
+        Figure, FigureCanvasTkAgg = figure_cls, canvas_cls
+    return Figure, FigureCanvasTkAgg
+
+# Número máximo de visualizaciones precalculadas que se mantienen en memoria
+VIZ_CACHE_SIZE = 4
+
+# Las visualizaciones solo se dibujan: basta con una frecuencia de muestreo baja
+VIZ_SR = 11025
+# Remuestreo rápido (soxr de baja calidad): suficiente para dibujar y mucho más
+# barato que el soxr_hq por defecto. El análisis numérico conserva la calidad alta.
+VIZ_RES_TYPE = 'soxr_qq'
+VIZ_N_FFT = 2048
+VIZ_HOP_LENGTH = 1024
+# Columnas máximas del chromagram que se entregan a imshow
+VIZ_MAX_COLUMNS = 2000
+
+# Intervalo (ms) con el que el hilo de Tk consulta si terminó el análisis
+ANALYSIS_POLL_MS = 100
+
+# Retardo (ms) para agrupar los eventos de arrastre de los sliders
+LABEL_DEBOUNCE_MS = 50
+
+# Etiquetas del eje de clases de tono del chromagram
+_NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+_CHROMA_YTICKS = tuple(range(12))
+
+# Librerías cuya presencia se muestra en la pestaña de configuración
+_DEP_NAMES = ('librosa', 'essentia', 'madmom', 'matplotlib')
+
+
+def _probe_dependencies():
+    """Comprobar qué librerías están instaladas sin llegar a importarlas"""
+    return {name: importlib.util.find_spec(name) is not None for name in _DEP_NAMES}
+
+
+# Resultado de la comprobación, calculado una sola vez al cargar el módulo
+_DEPS = _probe_dependencies()
+
+
+def _json_default(obj):
+    """Convertir arrays y escalares de NumPy a tipos serializables en JSON"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=8)
+def _marker_times(duration_s):
+    """Marcas de tiempo cada 10 segundos para una duración dada (en segundos enteros)"""
+    return np.arange(0, duration_s, 10)
+
+
 class MusicAnalyzerGUI:
     def __init__(self, root):
         self.root = root
@@ -28,6 +99,42 @@ class MusicAnalyzerGUI:
         self.analysis_results = None
         self.is_analyzing = False
         
+        # Un único worker reutilizado para todos los análisis
+        # Hilo daemon: no impide que el proceso termine al cerrar la ventana.
+        # Recibe trabajos por _analysis_jobs y deja los resultados en
+        # _analysis_results, que el hilo de Tk consulta con root.after
+        self._analysis_jobs = queue.Queue()
+        self._analysis_results = queue.Queue()
+        threading.Thread(target=self._analysis_worker, name='analysis', daemon=True).start()
+        # Parámetros del último análisis mostrado y texto de detalles ya formateado
+        self._last_analysis_key = None
+        self._details_cache = None
+        self._cached_basename = ""
+        self._cached_analysis_ts = ""
+        
+        # Audio decodificado para las visualizaciones (se carga una sola vez por archivo)
+        self._y = None
+        self._sr = None
+        # Espectrograma de potencia compartido por chromagram y onsets
+        self._stft_power = None
+        
+        # Datos de visualización ya calculados, por (archivo, tipo)
+        self._viz_cache = OrderedDict()
+        self._viz_busy = False
+        self._viz_pending = False
+        # Se incrementa al cambiar de archivo: los cálculos en curso de la
+        # generación anterior se descartan al terminar
+        self._viz_generation = 0
+        self._viz_lock = threading.Lock()
+        
+        # Figura de matplotlib reutilizada entre redibujados (se crea con los primeros datos)
+        self._canvas = None
+        self._placeholder = None
+        
+        # Callbacks pendientes de los sliders de configuración
+        self._silence_after_id = None
+        self._silence_dur_after_id = None
+        
         # Configurar estilo
         self.setup_style()
         
@@ -147,10 +254,7 @@ class MusicAnalyzerGUI:
         scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        scrollable_frame.bind("<Configure>", lambda e: self._schedule_scrollregion(canvas))
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
@@ -162,6 +266,18 @@ class MusicAnalyzerGUI:
         # Contenido de resultados
         self.create_results_content(scrollable_frame)
     
+    def _schedule_scrollregion(self, canvas):
+        """Recalcular la región de scroll una sola vez por ciclo idle"""
+        if getattr(canvas, '_bbox_pending', False):
+            return
+        canvas._bbox_pending = True
+        
+        def update():
+            canvas._bbox_pending = False
+            canvas.configure(scrollregion=canvas.bbox("all"))
+        
+        canvas.after_idle(update)
+    
     def create_results_content(self, parent):
         """Crear contenido de la pestaña de resultados"""
         # Frame para información del archivo
@@ -169,7 +285,8 @@ class MusicAnalyzerGUI:
         file_info_frame.pack(fill=tk.X, padx=10, pady=5)
         
         self.file_info_text = tk.Text(file_info_frame, height=4, bg='#3b3b3b', 
-                                     fg='white', font=('Courier', 10))
+                                     fg='white', font=('Courier', 10),
+                                     undo=False, state='disabled')
         self.file_info_text.pack(fill=tk.X)
         
         # Frame principal de resultados
@@ -213,7 +330,8 @@ class MusicAnalyzerGUI:
         silence_frame.pack(fill=tk.X, padx=10, pady=10)
         
         self.silence_info_text = tk.Text(silence_frame, height=6, bg='#3b3b3b', 
-                                        fg='white', font=('Courier', 9))
+                                        fg='white', font=('Courier', 9),
+                                        undo=False, state='disabled')
         self.silence_info_text.pack(fill=tk.X)
         
         # Frame de acciones
@@ -226,7 +344,13 @@ class MusicAnalyzerGUI:
         
         copy_btn = ttk.Button(actions_frame, text="📋 Copiar al Portapapeles",
                              command=self.copy_to_clipboard, style='Custom.TButton')
-        copy_btn.pack(side=tk.LEFT)
+        copy_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # El JSON compacto es bastante más pequeño y rápido de escribir
+        self.pretty_json_var = tk.BooleanVar(value=False)
+        pretty_check = ttk.Checkbutton(actions_frame, text="JSON legible (con sangría)",
+                                      variable=self.pretty_json_var)
+        pretty_check.pack(side=tk.LEFT)
     
     def create_visualization_tab(self):
         """Crear pestaña de visualizaciones"""
@@ -265,7 +389,8 @@ class MusicAnalyzerGUI:
         # Texto con detalles técnicos
         self.details_text = scrolledtext.ScrolledText(details_frame, 
                                                      bg='#3b3b3b', fg='white',
-                                                     font=('Courier', 10))
+                                                     font=('Courier', 10),
+                                                     undo=False, state='disabled')
         self.details_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
     
     def create_settings_tab(self):
@@ -305,9 +430,13 @@ class MusicAnalyzerGUI:
         libs_frame.pack(fill=tk.X, padx=10, pady=10)
         
         self.libs_text = tk.Text(libs_frame, height=8, bg='#3b3b3b', fg='white',
-                                font=('Courier', 10), state='disabled')
+                                font=('Courier', 10), undo=False, state='disabled')
         self.libs_text.pack(fill=tk.X)
         
+        rescan_btn = ttk.Button(libs_frame, text="🔄 Volver a comprobar",
+                               command=self.rescan_dependencies, style='Custom.TButton')
+        rescan_btn.pack(anchor=tk.E, pady=(10, 0))
+        
         # Botones de ayuda
         help_frame = ttk.Frame(settings_frame)
         help_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -342,18 +471,68 @@ class MusicAnalyzerGUI:
     
     def init_empty_plot(self):
         """Inicializar plot vacío"""
-        fig, ax = plt.subplots(figsize=(10, 4))
-        fig.patch.set_facecolor('#2b2b2b')
-        ax.set_facecolor('#3b3b3b')
-        ax.text(0.5, 0.5, 'Selecciona un archivo y analízalo\npara ver las visualizaciones',
-                horizontalalignment='center', verticalalignment='center',
-                transform=ax.transAxes, color='white', fontsize=12)
-        ax.set_xticks([])
-        ax.set_yticks([])
-        
-        self.canvas = FigureCanvasTkAgg(fig, self.plot_frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Un Label basta como marcador: matplotlib solo se carga cuando hay datos
+        if self._placeholder is None:
+            self._placeholder = ttk.Label(self.plot_frame,
+                                          text='Selecciona un archivo y analízalo\npara ver las visualizaciones',
+                                          style='Info.TLabel', anchor='center', justify='center')
+        if self._canvas is not None:
+            self._canvas.get_tk_widget().pack_forget()
+        self._placeholder.pack(fill=tk.BOTH, expand=True)
+    
+    def _ensure_plot(self):
+        """Crear (una sola vez) la figura reutilizada y mostrarla en lugar del marcador"""
+        if self._canvas is None:
+            Figure, FigureCanvasTkAgg = _mpl()
+            self._fig = Figure(figsize=(12, 6), constrained_layout=True)
+            self._ax = self._fig.add_subplot(111)
+            self._fig.patch.set_facecolor('#2b2b2b')
+            self._chroma_cbar = None
+            self._chroma_im = None
+            self._onset_line = None
+            self._onset_fill = None
+            self._bg = None
+            self._canvas = FigureCanvasTkAgg(self._fig, self.plot_frame)
+            # Cada dibujado completo (también al redimensionar) renueva el fondo para blit
+            self._canvas.mpl_connect('draw_event', self._on_draw)
+        
+        self._placeholder.pack_forget()
+        self._canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def _clear_plot(self):
+        """Limpiar los ejes (y la barra de color) de la figura reutilizada"""
+        if self._chroma_cbar is not None:
+            self._chroma_cbar.remove()
+            self._chroma_cbar = None
+        self._chroma_im = None
+        self._onset_line = None
+        self._onset_fill = None
+        self._bg = None
+        self._ax.clear()
+        self._ax.set_facecolor('#3b3b3b')
+    
+    def _on_draw(self, event):
+        """Guardar el fondo estático y pintar encima la curva de onsets"""
+        if self._onset_line is None:
+            self._bg = None
+            return
+        self._bg = self._canvas.copy_from_bbox(self._ax.bbox)
+        self._draw_onset_artists()
+    
+    def _draw_onset_artists(self):
+        """Dibujar solo los artistas dinámicos de la curva de onsets"""
+        self._ax.draw_artist(self._onset_fill)
+        self._ax.draw_artist(self._onset_line)
+    
+    def _show_plot_message(self, text, color):
+        """Mostrar un mensaje centrado en lugar de un gráfico"""
+        self._clear_plot()
+        self._ax.text(0.5, 0.5, text,
+                      horizontalalignment='center', verticalalignment='center',
+                      transform=self._ax.transAxes, color=color, fontsize=12)
+        self._ax.set_xticks([])
+        self._ax.set_yticks([])
+        self._canvas.draw_idle()
     
     def select_file(self):
         """Seleccionar archivo de audio"""
@@ -396,33 +575,71 @@ class MusicAnalyzerGUI:
         if self.is_analyzing:
             return
         
+        # Mismo archivo y mismos parámetros: los resultados mostrados siguen siendo válidos
+        key = (self.current_file.get(), self.silence_threshold_var.get(), self.min_silence_var.get())
+        if key == self._last_analysis_key and self.analysis_results:
+            self.status_label.config(text="Análisis ya realizado con estos parámetros")
+            return
+        
         self.is_analyzing = True
         self.analyze_btn.config(state='disabled', text="⏳ Analizando...")
         self.progress_bar.start()
         self.status_label.config(text="Analizando audio...")
         
-        # Ejecutar análisis en hilo separado
-        thread = threading.Thread(target=self.run_analysis)
-        thread.daemon = True
-        thread.start()
+        # Encargar el análisis al worker; las variables de Tk se leen aquí, en el hilo principal
+        self._analysis_jobs.put(key)
+        self.root.after(ANALYSIS_POLL_MS, self._poll_analysis)
     
-    def run_analysis(self):
-        """Ejecutar análisis de audio"""
+    def _analysis_worker(self):
+        """Bucle del hilo de análisis: nunca toca Tk"""
+        while True:
+            key = self._analysis_jobs.get()
+            try:
+                self._analysis_results.put((key, self.run_analysis(*key), None))
+            except Exception as e:
+                self._analysis_results.put((key, None, e))
+    
+    def _poll_analysis(self):
+        """Recoger el resultado del worker desde el hilo principal"""
         try:
-            # Crear analizador con configuración personalizada
-            analyzer = MusicAnalyzer()
-            analyzer.silence_threshold = self.silence_threshold_var.get()
-            analyzer.min_silence_duration = self.min_silence_var.get()
-            
-            # Realizar análisis
-            self.analysis_results = analyzer.analyze_song(self.current_file.get(), verbose=False)
-            
-            # Actualizar UI en hilo principal
-            self.root.after(0, self.analysis_complete)
-            
-        except Exception as e:
-            error_msg = f"Error durante el análisis: {str(e)}"
-            self.root.after(0, lambda: self.analysis_error(error_msg))
+            key, result, exc = self._analysis_results.get_nowait()
+        except queue.Empty:
+            self.root.after(ANALYSIS_POLL_MS, self._poll_analysis)
+            return
+        self._after_analysis(key, result, exc)
+    
+    def run_analysis(self, path, silence_threshold, min_silence_duration):
+        """Ejecutar análisis de audio"""
+        # Crear analizador con configuración personalizada
+        analyzer = MusicAnalyzer()
+        analyzer.silence_threshold = silence_threshold
+        analyzer.min_silence_duration = min_silence_duration
+        
+        # Realizar análisis
+        results = analyzer.analyze_song(path, verbose=False)
+        
+        # Decodificar el audio una sola vez para las visualizaciones; se guarda
+        # en el hilo principal, solo si el archivo sigue siendo el actual
+        audio = None
+        if 'error' not in results and self._y is None:
+            audio = self._load_viz_audio(path)
+        
+        return results, audio
+    
+    def _after_analysis(self, key, result, exc):
+        """Despachar el resultado del análisis (en el hilo principal)"""
+        if exc is not None:
+            self.analysis_error(f"Error durante el análisis: {str(exc)}")
+            return
+        
+        self.analysis_results, audio = result
+        if audio is not None and key[0] == self.current_file.get():
+            with self._viz_lock:
+                if self._y is None:
+                    self._y, self._sr = audio
+        self.analysis_complete()
+        if self.analysis_results and 'error' not in self.analysis_results:
+            self._last_analysis_key = key
     
     def analysis_complete(self):
         """Callback cuando el análisis se completa exitosamente"""
@@ -432,6 +649,11 @@ class MusicAnalyzerGUI:
         self.status_label.config(text="Análisis completado")
         
         if self.analysis_results and 'error' not in self.analysis_results:
+            # Los beats pueden cambiar con un nuevo análisis
+            self._viz_cache.clear()
+            # Datos fijos del análisis, calculados una sola vez
+            self._cached_basename = os.path.basename(self.analysis_results['file_path'])
+            self._cached_analysis_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             self.update_results_display()
             self.update_visualization()
             self.update_details_display()
@@ -453,17 +675,21 @@ class MusicAnalyzerGUI:
         if not self.analysis_results:
             return
         
+        results = self.analysis_results
+        audio_info = results['audio_info']
+        bpm_data = results['bpm_analysis']
+        key_data = results['key_analysis']
+        silence_data = results['silence_analysis']
+        
         # Información del archivo
-        file_info = f"""Archivo: {os.path.basename(self.analysis_results['file_path'])}
-Duración: {self.analysis_results['duration']:.2f} segundos
-Sample Rate: {self.analysis_results['audio_info']['sample_rate']} Hz
-Muestras: {self.analysis_results['audio_info']['samples']:,}"""
+        file_info = f"""Archivo: {self._cached_basename}
+Duración: {results['duration']:.2f} segundos
+Sample Rate: {audio_info['sample_rate']} Hz
+Muestras: {audio_info['samples']:,}"""
         
-        self.file_info_text.delete(1.0, tk.END)
-        self.file_info_text.insert(tk.END, file_info)
+        self._set_text(self.file_info_text, file_info)
         
         # Resultados BPM
-        bpm_data = self.analysis_results['bpm_analysis']
         self.bpm_result_label.config(text=f"{bpm_data['bpm']:.1f} BPM")
         self.bpm_confidence_label.config(text=f"Confianza: {bpm_data['confidence']*100:.1f}%")
         self.bpm_method_label.config(text=f"Método: {bpm_data['method']}")
@@ -476,7 +702,6 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
             self.bpm_stability_label.config(text="Tempo: No evaluado")
         
         # Resultados Key
-        key_data = self.analysis_results['key_analysis']
         self.key_result_label.config(text=f"{key_data['key']} {key_data['scale'].title()}")
         self.key_confidence_label.config(text=f"Confianza: {key_data['confidence']*100:.1f}%")
         self.key_method_label.config(text=f"Método: {key_data['method']}")
@@ -485,51 +710,175 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
         self.key_changes_label.config(text=f"Cambios: {changes}")
         
         # Información de silencios
-        silence_data = self.analysis_results['silence_analysis']
-        silence_info = f"Segmentos de silencio encontrados: {silence_data['segments_found']}\n"
-        silence_info += f"Duración total de silencios: {silence_data['total_silence_duration']:.2f}s\n\n"
+        segments = silence_data['segments']
+        silence_lines = [
+            f"Segmentos de silencio encontrados: {silence_data['segments_found']}",
+            f"Duración total de silencios: {silence_data['total_silence_duration']:.2f}s",
+            "",
+        ]
         
-        if silence_data['segments']:
-            silence_info += "Ubicación de silencios:\n"
-            for i, (start, end, duration) in enumerate(silence_data['segments'][:10]):  # Mostrar máximo 10
-                silence_info += f"  {i+1:2d}. {start:6.2f}s - {end:6.2f}s ({duration:.2f}s)\n"
-            if len(silence_data['segments']) > 10:
-                silence_info += f"  ... y {len(silence_data['segments'])-10} más\n"
+        if segments:
+            silence_lines.append("Ubicación de silencios:")
+            silence_lines.extend(  # Mostrar máximo 10
+                f"  {i:2d}. {start:6.2f}s - {end:6.2f}s ({duration:.2f}s)"
+                for i, (start, end, duration) in enumerate(segments[:10], 1))
+            if len(segments) > 10:
+                silence_lines.append(f"  ... y {len(segments)-10} más")
+            silence_lines.append("")
         else:
-            silence_info += "No se encontraron silencios significativos."
+            silence_lines.append("No se encontraron silencios significativos.")
+        silence_info = "\n".join(silence_lines)
         
-        self.silence_info_text.delete(1.0, tk.END)
-        self.silence_info_text.insert(tk.END, silence_info)
+        self._set_text(self.silence_info_text, silence_info)
     
     def update_visualization(self, event=None):
         """Actualizar visualización según la opción seleccionada"""
         if not self.analysis_results:
             return
         
-        # Limpiar plot anterior
-        for widget in self.plot_frame.winfo_children():
-            widget.destroy()
+        # Evitar acumular hilos con clics rápidos: se recalcula al terminar
+        if self._viz_busy:
+            self._viz_pending = True
+            return
+        
+        self._viz_busy = True
+        self._viz_pending = False
+        viz_type = self.viz_var.get()
+        file_path = self.current_file.get()
+        results = self.analysis_results
+        generation = self._viz_generation
+        
+        # Los cálculos de librosa se hacen fuera del hilo de Tk
+        thread = threading.Thread(
+            target=lambda: self._viz_done(self._compute_viz(viz_type, file_path, results, generation)))
+        thread.daemon = True
+        thread.start()
+    
+    def _viz_done(self, data):
+        """Entregar los datos calculados al hilo principal"""
+        self.root.after(0, self._render_viz, data)
+    
+    def _load_viz_audio(self, path):
+        """Decodificar el audio usado solo para las visualizaciones, devuelve (y, sr)"""
+        return _get_librosa().load(path, sr=VIZ_SR, mono=True, res_type=VIZ_RES_TYPE)
+    
+    def _compute_viz(self, viz_type, file_path, results, generation):
+        """Calcular los datos de una visualización (sin tocar Tk)
+        
+        Todo se calcula en variables locales; el audio, la STFT y la caché
+        compartidos solo se actualizan si el archivo no cambió entretanto.
+        """
+        try:
+            librosa = _get_librosa()
+            stale = {'viz_type': viz_type, 'generation': generation}
+            key = (file_path, viz_type)
+            with self._viz_lock:
+                if generation != self._viz_generation:
+                    # El archivo cambió antes de empezar: no decodificar nada
+                    return stale
+                y, sr, S = self._y, self._sr, self._stft_power
+                cached = self._viz_cache.get(key)
+            if y is None:
+                y, sr = self._load_viz_audio(file_path)
+                S = None
+                if generation != self._viz_generation:
+                    return stale
+            if cached is None:
+                cached = {}
+                if viz_type == "tempo":
+                    # Los beats son frames a la frecuencia de muestreo del análisis
+                    beats = results['bpm_analysis'].get('beats', [])
+                    analysis_sr = results['audio_info']['analysis_sample_rate']
+                    cached['beat_times'] = librosa.frames_to_time(beats, sr=analysis_sr) if len(beats) > 0 else None
+                elif viz_type == "onset_strength" and 'onset_envelope' in results['bpm_analysis']:
+                    # Reutilizar la envolvente de onsets que ya calculó el análisis de BPM
+                    onset_env = results['bpm_analysis']['onset_envelope']
+                    analysis_sr = results['audio_info']['analysis_sample_rate']
+                    cached['onset_env'] = onset_env
+                    cached['times'] = librosa.times_like(onset_env, sr=analysis_sr, hop_length=HOP_LENGTH)
+                else:
+                    # Una sola STFT sirve para el chromagram y para los onsets
+                    if S is None:
+                        # Elevar al cuadrado sobre el mismo buffer, como en el analizador
+                        S = np.abs(librosa.stft(y, n_fft=VIZ_N_FFT, hop_length=VIZ_HOP_LENGTH))
+                        np.square(S, out=S)
+                    
+                    if viz_type == "chromagram":
+                        chroma = librosa.feature.chroma_stft(S=S, sr=sr, n_fft=VIZ_N_FFT, hop_length=VIZ_HOP_LENGTH)
+                        # División redondeando hacia arriba: como mucho VIZ_MAX_COLUMNS columnas
+                        step = max(1, -(-chroma.shape[1] // VIZ_MAX_COLUMNS))
+                        cached['chroma'] = chroma[:, ::step]
+                        # imshow solo necesita los límites, no un tiempo por frame
+                        cached['extent'] = (0.0, len(y) / sr, 0.0, 12.0)
+                    elif viz_type == "onset_strength":
+                        onset_env = librosa.onset.onset_strength(S=librosa.power_to_db(S), sr=sr, hop_length=VIZ_HOP_LENGTH)
+                        cached['onset_env'] = onset_env
+                        cached['times'] = librosa.times_like(onset_env, sr=sr, hop_length=VIZ_HOP_LENGTH)
+            
+            with self._viz_lock:
+                if generation == self._viz_generation:
+                    self._y, self._sr, self._stft_power = y, sr, S
+                    self._viz_cache[key] = cached
+                    self._viz_cache.move_to_end(key)
+                    if len(self._viz_cache) > VIZ_CACHE_SIZE:
+                        self._viz_cache.popitem(last=False)
+            
+            return dict(cached, viz_type=viz_type, duration=len(y) / sr, generation=generation)
+        
+        except Exception as e:
+            return {'viz_type': viz_type, 'error': str(e), 'generation': generation}
+    
+    def _render_viz(self, data):
+        """Dibujar en el canvas los datos calculados por _compute_viz"""
+        self._viz_busy = False
+        if self._viz_pending:
+            # El usuario cambió de visualización mientras se calculaba
+            self.update_visualization()
+            return
+        if data['generation'] != self._viz_generation:
+            # Resultado de un archivo anterior: se mantiene el placeholder
+            return
+        
+        self._ensure_plot()
         
         try:
-            import librosa
-            y, sr = librosa.load(self.current_file.get(), sr=22050)
+            if 'error' in data:
+                raise RuntimeError(data['error'])
+            
+            viz_type = data['viz_type']
+            
+            if viz_type == "chromagram" and self._chroma_im is not None:
+                # Reutilizar la imagen y la barra de color ya existentes
+                self._chroma_im.set_data(data['chroma'])
+                self._chroma_im.set_extent(data['extent'])
+                self._ax.set_title(f'Chromagram - Key: {self.analysis_results["key_analysis"]["key"]} {self.analysis_results["key_analysis"]["scale"]}', 
+                                   color='white', fontsize=14)
+                self._canvas.draw_idle()
+                return
             
-            fig, ax = plt.subplots(figsize=(12, 6))
-            fig.patch.set_facecolor('#2b2b2b')
-            ax.set_facecolor('#3b3b3b')
+            if viz_type == "onset_strength" and self._can_blit_onsets(data):
+                # Solo cambia la curva: restaurar el fondo y redibujarla encima
+                self._onset_line.set_ydata(data['onset_env'])
+                self._onset_fill.remove()
+                self._onset_fill = self._ax.fill_between(data['times'], data['onset_env'], alpha=0.3,
+                                                         color='#FFC107', animated=True)
+                self._canvas.restore_region(self._bg)
+                self._draw_onset_artists()
+                self._canvas.blit(self._ax.bbox)
+                return
             
-            viz_type = self.viz_var.get()
+            # Limpiar plot anterior
+            self._clear_plot()
+            ax = self._ax
             
             if viz_type == "tempo":
                 # Visualizar beats y tempo
-                beats = self.analysis_results['bpm_analysis'].get('beats', [])
-                if len(beats) > 0:
-                    times = librosa.frames_to_time(beats, sr=sr)
-                    ax.vlines(times, 0, 1, color='#4CAF50', alpha=0.8, linewidth=2, label='Beats detectados')
+                if data['beat_times'] is not None:
+                    ax.vlines(data['beat_times'], 0, 1, color='#4CAF50', alpha=0.8, linewidth=2, label='Beats detectados')
                 
                 # Agregar líneas de tiempo
-                duration = len(y) / sr
-                time_markers = np.arange(0, duration, 10)  # Cada 10 segundos
+                duration = data['duration']
+                time_markers = _marker_times(math.ceil(duration))  # Cada 10 segundos
                 ax.vlines(time_markers, 0, 1, color='white', alpha=0.3, linewidth=0.5)
                 
                 ax.set_ylim(0, 1)
@@ -541,30 +890,30 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
                 
             elif viz_type == "chromagram":
                 # Chromagram para análisis tonal
-                chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-                times = librosa.frames_to_time(np.arange(chroma.shape[1]), sr=sr)
-                
-                im = ax.imshow(chroma, aspect='auto', origin='lower', 
-                             extent=[times[0], times[-1], 0, 12], cmap='plasma')
+                # El chroma está normalizado a [0, 1]: la escala de color es fija
+                # y la barra de color no necesita recalcularse en cada redibujado
+                im = self._chroma_im = ax.imshow(data['chroma'], aspect='auto', origin='lower', 
+                                                 extent=data['extent'], cmap='plasma',
+                                                 vmin=0, vmax=1)
                 ax.set_xlabel('Tiempo (s)', color='white')
                 ax.set_ylabel('Clases de Tono', color='white')
                 ax.set_title(f'Chromagram - Key: {self.analysis_results["key_analysis"]["key"]} {self.analysis_results["key_analysis"]["scale"]}', 
                            color='white', fontsize=14)
                 
                 # Etiquetas de notas
-                note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-                ax.set_yticks(range(12))
-                ax.set_yticklabels(note_names)
+                ax.set_yticks(_CHROMA_YTICKS)
+                ax.set_yticklabels(_NOTE_NAMES)
                 
-                plt.colorbar(im, ax=ax)
+                self._chroma_cbar = self._fig.colorbar(im, ax=ax)
                 
             elif viz_type == "onset_strength":
                 # Onset strength para análisis rítmico
-                onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-                times = librosa.frames_to_time(np.arange(len(onset_env)), sr=sr)
+                onset_env = data['onset_env']
+                times = data['times']
                 
-                ax.plot(times, onset_env, color='#FFC107', linewidth=1)
-                ax.fill_between(times, onset_env, alpha=0.3, color='#FFC107')
+                # Curva y relleno animados: se excluyen del fondo guardado para blit
+                self._onset_line, = ax.plot(times, onset_env, color='#FFC107', linewidth=1, animated=True)
+                self._onset_fill = ax.fill_between(times, onset_env, alpha=0.3, color='#FFC107', animated=True)
                 
                 ax.set_xlabel('Tiempo (s)', color='white')
                 ax.set_ylabel('Onset Strength', color='white')
@@ -577,107 +926,124 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
             ax.spines['top'].set_visible(False)
             ax.spines['right'].set_visible(False)
             
-            plt.tight_layout()
-            
-            # Integrar plot en tkinter
-            canvas = FigureCanvasTkAgg(fig, self.plot_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._canvas.draw_idle()
             
         except Exception as e:
             # Plot de error
-            fig, ax = plt.subplots(figsize=(10, 4))
-            fig.patch.set_facecolor('#2b2b2b')
-            ax.set_facecolor('#3b3b3b')
-            ax.text(0.5, 0.5, f'Error generando visualización:\n{str(e)}',
-                    horizontalalignment='center', verticalalignment='center',
-                    transform=ax.transAxes, color='red', fontsize=12)
-            ax.set_xticks([])
-            ax.set_yticks([])
-            
-            canvas = FigureCanvasTkAgg(fig, self.plot_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._show_plot_message(f'Error generando visualización:\n{str(e)}', 'red')
+    
+    def _can_blit_onsets(self, data):
+        """Indicar si la nueva curva de onsets cabe en los ejes y el fondo ya dibujados"""
+        return (self._onset_line is not None and self._bg is not None
+                and len(data['times']) == len(self._onset_line.get_xdata())
+                and data['onset_env'].max() <= self._ax.get_ylim()[1])
     
     def update_details_display(self):
         """Actualizar la visualización de detalles técnicos"""
         if not self.analysis_results:
             return
         
-        details = "=== DETALLES TÉCNICOS DEL ANÁLISIS ===\n\n"
+        results = self.analysis_results
+        threshold = self.silence_threshold_var.get()
+        min_silence = self.min_silence_var.get()
+        cache = self._details_cache
+        if cache is not None and cache[0] is results and cache[1:3] == (threshold, min_silence):
+            self._set_text(self.details_text, cache[3])
+            return
+        
+        audio_info = results['audio_info']
+        bpm_data = results['bpm_analysis']
+        key_data = results['key_analysis']
+        silence_data = results['silence_analysis']
+        
+        parts = ["=== DETALLES TÉCNICOS DEL ANÁLISIS ===\n\n"]
         
         # Información general
-        details += f"Archivo: {self.analysis_results['file_path']}\n"
-        details += f"Fecha de análisis: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        details += f"Duración: {self.analysis_results['duration']:.3f} segundos\n"
-        details += f"Sample Rate: {self.analysis_results['audio_info']['sample_rate']} Hz\n"
-        details += f"Total de muestras: {self.analysis_results['audio_info']['samples']:,}\n\n"
+        parts.append(
+            f"Archivo: {results['file_path']}\n"
+            f"Fecha de análisis: {self._cached_analysis_ts}\n"
+            f"Duración: {results['duration']:.3f} segundos\n"
+            f"Sample Rate: {audio_info['sample_rate']} Hz\n"
+            f"Total de muestras: {audio_info['samples']:,}\n\n")
         
         # Análisis BPM detallado
-        bpm_data = self.analysis_results['bpm_analysis']
-        details += "=== ANÁLISIS BPM ===\n"
-        details += f"BPM Final: {bpm_data['bpm']:.2f}\n"
-        details += f"Confianza: {bpm_data['confidence']:.4f} ({bpm_data['confidence']*100:.1f}%)\n"
-        details += f"Método principal: {bpm_data['method']}\n"
-        details += f"Beats detectados: {bpm_data['beats_detected']}\n"
-
-        if 'tempo_stability' in bpm_data and bpm_data['tempo_stability'] is not None:
-            details += f"Estabilidad del tempo: {bpm_data['tempo_stability']:.4f}\n"
-            if bpm_data['tempo_stability'] < 0.2:
-                details += "  -> Tempo muy estable\n"
-            elif bpm_data['tempo_stability'] < 0.4:
-                details += "  -> Tempo moderadamente variable\n"
+        parts.append(
+            "=== ANÁLISIS BPM ===\n"
+            f"BPM Final: {bpm_data['bpm']:.2f}\n"
+            f"Confianza: {bpm_data['confidence']:.4f} ({bpm_data['confidence']*100:.1f}%)\n"
+            f"Método principal: {bpm_data['method']}\n"
+            f"Beats detectados: {bpm_data['beats_detected']}\n")
+
+        tempo_stability = bpm_data.get('tempo_stability')
+        if tempo_stability is not None:
+            parts.append(f"Estabilidad del tempo: {tempo_stability:.4f}\n")
+            if tempo_stability < 0.2:
+                parts.append("  -> Tempo muy estable\n")
+            elif tempo_stability < 0.4:
+                parts.append("  -> Tempo moderadamente variable\n")
             else:
-                details += "  -> Tempo muy variable (cambios frecuentes)\n"
+                parts.append("  -> Tempo muy variable (cambios frecuentes)\n")
 
-        details += "\nTodas las estimaciones BPM:\n"
-        for i, est in enumerate(bpm_data.get('all_estimates', []), 1):
-            details += f"  {i}. {est['bpm']:.2f} BPM (confianza: {est['confidence']:.3f}, método: {est['method']})\n"
+        parts.append("\nTodas las estimaciones BPM:\n")
+        parts.extend(
+            f"  {i}. {est['bpm']:.2f} BPM (confianza: {est['confidence']:.3f}, método: {est['method']})\n"
+            for i, est in enumerate(bpm_data.get('all_estimates', []), 1))
         
         # Análisis de tonalidad detallado
-        key_data = self.analysis_results['key_analysis']
-        details += "\n=== ANÁLISIS DE TONALIDAD ===\n"
-        details += f"Tonalidad: {key_data['key']} {key_data['scale']}\n"
-        details += f"Confianza: {key_data['confidence']:.4f} ({key_data['confidence']*100:.1f}%)\n"
-        details += f"Método: {key_data['method']}\n"
-        
-        if 'key_stability' in key_data and key_data['key_stability'] is not None:
-            details += f"Estabilidad tonal: {key_data['key_stability']:.4f}\n"
-            if key_data['key_stability'] > 0.8:
-                details += "  -> Tonalidad muy consistente\n"
-            elif key_data['key_stability'] > 0.6:
-                details += "  -> Tonalidad moderadamente consistente\n"
+        parts.append(
+            "\n=== ANÁLISIS DE TONALIDAD ===\n"
+            f"Tonalidad: {key_data['key']} {key_data['scale']}\n"
+            f"Confianza: {key_data['confidence']:.4f} ({key_data['confidence']*100:.1f}%)\n"
+            f"Método: {key_data['method']}\n")
+        
+        key_stability = key_data.get('key_stability')
+        if key_stability is not None:
+            parts.append(f"Estabilidad tonal: {key_stability:.4f}\n")
+            if key_stability > 0.8:
+                parts.append("  -> Tonalidad muy consistente\n")
+            elif key_stability > 0.6:
+                parts.append("  -> Tonalidad moderadamente consistente\n")
             else:
-                details += "  -> Tonalidad variable (posibles modulaciones)\n"
+                parts.append("  -> Tonalidad variable (posibles modulaciones)\n")
         
         if key_data.get('key_changes_detected', False):
-            details += "ADVERTENCIA: Se detectaron cambios de tonalidad en la canción\n"
+            parts.append("ADVERTENCIA: Se detectaron cambios de tonalidad en la canción\n")
         
         # Análisis de silencios
-        silence_data = self.analysis_results['silence_analysis']
-        details += "\n=== ANÁLISIS DE SILENCIOS ===\n"
-        details += f"Umbral utilizado: {self.silence_threshold_var.get()} dB\n"
-        details += f"Duración mínima: {self.min_silence_var.get()} segundos\n"
-        details += f"Segmentos encontrados: {silence_data['segments_found']}\n"
-        details += f"Tiempo total de silencio: {silence_data['total_silence_duration']:.3f}s\n"
-        details += f"Porcentaje de silencio: {(silence_data['total_silence_duration']/self.analysis_results['duration'])*100:.1f}%\n"
+        parts.append(
+            "\n=== ANÁLISIS DE SILENCIOS ===\n"
+            f"Umbral utilizado: {threshold} dB\n"
+            f"Duración mínima: {min_silence} segundos\n"
+            f"Segmentos encontrados: {silence_data['segments_found']}\n"
+            f"Tiempo total de silencio: {silence_data['total_silence_duration']:.3f}s\n"
+            f"Porcentaje de silencio: {(silence_data['total_silence_duration']/results['duration'])*100:.1f}%\n")
         
         if silence_data['segments']:
-            details += "\nDetalle de segmentos silenciosos:\n"
-            for i, (start, end, duration) in enumerate(silence_data['segments'], 1):
-                details += f"  {i:2d}. {start:7.3f}s - {end:7.3f}s (duración: {duration:.3f}s)\n"
+            parts.append("\nDetalle de segmentos silenciosos:\n")
+            parts.extend(
+                f"  {i:2d}. {start:7.3f}s - {end:7.3f}s (duración: {duration:.3f}s)\n"
+                for i, (start, end, duration) in enumerate(silence_data['segments'], 1))
         
         # Información técnica adicional
-        details += "\n=== CONFIGURACIÓN TÉCNICA ===\n"
-        details += f"Hop length: 512 samples\n"
-        details += f"Frame length: 2048 samples\n"
-        details += f"Ventana de análisis: ~93ms por frame\n"
-        details += f"Resolución temporal: ~23ms entre frames\n"
-        
-        self.details_text.config(state='normal')
-        self.details_text.delete(1.0, tk.END)
-        self.details_text.insert(tk.END, details)
-        self.details_text.config(state='disabled')
+        parts.append(
+            "\n=== CONFIGURACIÓN TÉCNICA ===\n"
+            f"Sample rate de análisis: {audio_info['analysis_sample_rate']} Hz\n"
+            "Hop length: 512 samples\n"
+            "Frame length: 2048 samples\n"
+            "Ventana de análisis: ~93ms por frame\n"
+            "Resolución temporal: ~23ms entre frames\n")
+        details = "".join(parts)
+        self._details_cache = (results, threshold, min_silence, details)
+        
+        self._set_text(self.details_text, details)
+    
+    def _set_text(self, widget, text):
+        """Reemplazar el contenido de un widget de texto de solo lectura en un solo paso"""
+        widget.config(state='normal')
+        widget.delete('1.0', tk.END)
+        if text:
+            widget.insert('1.0', text)
+        widget.config(state='disabled')
     
     def export_results(self):
         """Exportar resultados a archivo JSON"""
@@ -685,7 +1051,7 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
             messagebox.showwarning("Advertencia", "No hay resultados para exportar")
             return
         
-        filename = filedialog.asksavfilename(
+        filename = filedialog.asksaveasfilename(
             title="Guardar resultados",
             defaultextension=".json",
             filetypes=[("JSON", "*.json"), ("Texto", "*.txt"), ("Todos", "*.*")]
@@ -704,24 +1070,36 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
                 }
                 
                 if filename.endswith('.json'):
+                    # json.dump escribe por fragmentos: no se construye el texto completo en memoria
+                    indent = 2 if self.pretty_json_var.get() else None
                     with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(export_data, f, indent=2, ensure_ascii=False)
+                        json.dump(export_data, f, indent=indent, ensure_ascii=False,
+                                  default=_json_default)
                 else:
                     # Exportar como texto
+                    results = self.analysis_results
+                    key_data = results['key_analysis']
+                    header = (
+                        "RESULTADOS DEL ANÁLISIS MUSICAL\n"
+                        f"{'=' * 50}\n\n"
+                        f"Archivo: {self._cached_basename}\n"
+                        f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                        f"Duración: {results['duration']:.2f}s\n\n"
+                        "RESULTADOS PRINCIPALES:\n"
+                        f"BPM: {results['bpm_analysis']['bpm']:.1f}\n"
+                        f"Tonalidad: {key_data['key']} {key_data['scale']}\n\n"
+                        "DETALLES COMPLETOS:\n"
+                    )
+                    # El resumen en texto omite las series por frame (chromagram y
+                    # envolvente de onsets); la exportación JSON las conserva completas
+                    bpm_data = results['bpm_analysis']
+                    details = dict(
+                        results,
+                        bpm_analysis={k: v for k, v in bpm_data.items() if k != 'onset_envelope'},
+                        key_analysis={k: v for k, v in key_data.items() if k != 'chromagram'})
                     with open(filename, 'w', encoding='utf-8') as f:
-                        f.write("RESULTADOS DEL ANÁLISIS MUSICAL\n")
-                        f.write("=" * 50 + "\n\n")
-                        
-                        f.write(f"Archivo: {os.path.basename(self.analysis_results['file_path'])}\n")
-                        f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write(f"Duración: {self.analysis_results['duration']:.2f}s\n\n")
-                        
-                        f.write("RESULTADOS PRINCIPALES:\n")
-                        f.write(f"BPM: {self.analysis_results['bpm_analysis']['bpm']:.1f}\n")
-                        f.write(f"Tonalidad: {self.analysis_results['key_analysis']['key']} {self.analysis_results['key_analysis']['scale']}\n\n")
-                        
-                        f.write("DETALLES COMPLETOS:\n")
-                        f.write(json.dumps(self.analysis_results, indent=2, ensure_ascii=False))
+                        f.write(header)
+                        json.dump(details, f, indent=2, ensure_ascii=False, default=_json_default)
                 
                 messagebox.showinfo("Éxito", f"Resultados exportados a:\n{filename}")
                 
@@ -738,7 +1116,7 @@ Muestras: {self.analysis_results['audio_info']['samples']:,}"""
             bpm_data = self.analysis_results['bpm_analysis']
             key_data = self.analysis_results['key_analysis']
 
-            clipboard_text = f"""Análisis Musical - {os.path.basename(self.analysis_results['file_path'])}
+            clipboard_text = f"""Análisis Musical - {self._cached_basename}
 
 BPM: {bpm_data['bpm']:.1f} (confianza: {bpm_data['confidence']*100:.1f}%)
 Tonalidad: {key_data['key']} {key_data['scale']} (confianza: {key_data['confidence']*100:.1f}%)
@@ -756,15 +1134,35 @@ Método Key: {key_data['method']}"""
     
     def update_silence_label(self, value):
         """Actualizar label del umbral de silencio"""
-        self.silence_value_label.config(text=f"{float(value):.0f} dB")
+        # Agrupar los eventos del arrastre: solo se pinta el último valor
+        if self._silence_after_id:
+            self.root.after_cancel(self._silence_after_id)
+        text = f"{float(value):.0f} dB"
+        self._silence_after_id = self.root.after(
+            LABEL_DEBOUNCE_MS, lambda: self.silence_value_label.config(text=text))
     
     def update_silence_dur_label(self, value):
         """Actualizar label de duración mínima de silencio"""
-        self.silence_dur_label.config(text=f"{float(value):.1f} s")
+        if self._silence_dur_after_id:
+            self.root.after_cancel(self._silence_dur_after_id)
+        text = f"{float(value):.1f} s"
+        self._silence_dur_after_id = self.root.after(
+            LABEL_DEBOUNCE_MS, lambda: self.silence_dur_label.config(text=text))
     
     def reset_results(self):
         """Resetear todos los resultados mostrados"""
         self.analysis_results = None
+        self._last_analysis_key = None
+        self._details_cache = None
+        # Descartar el audio del archivo anterior e invalidar las
+        # visualizaciones que aún se estén calculando
+        with self._viz_lock:
+            self._y = None
+            self._sr = None
+            self._stft_power = None
+            self._viz_cache.clear()
+            self._viz_generation += 1
+        self._viz_pending = False
 
         # Resetear labels de resultados
         self.bpm_result_label.config(text="---")
@@ -778,11 +1176,9 @@ Método Key: {key_data['method']}"""
         self.key_changes_label.config(text="Cambios: ---")
         
         # Limpiar textos
-        self.file_info_text.delete(1.0, tk.END)
-        self.silence_info_text.delete(1.0, tk.END)
-        self.details_text.config(state='normal')
-        self.details_text.delete(1.0, tk.END)
-        self.details_text.config(state='disabled')
+        self._set_text(self.file_info_text, "")
+        self._set_text(self.silence_info_text, "")
+        self._set_text(self.details_text, "")
         
         # Resetear visualización
         self.init_empty_plot()
@@ -791,30 +1187,15 @@ Método Key: {key_data['method']}"""
         """Verificar estado de las dependencias"""
         libs_status = []
         
-        # Verificar librerías principales
-        try:
-            import librosa  # noqa: F401
-            libs_status.append("✅ librosa: Disponible")
-        except ImportError:
-            libs_status.append("❌ librosa: NO disponible")
-
-        try:
-            import essentia  # noqa: F401
-            libs_status.append("✅ essentia: Disponible")
-        except ImportError:
-            libs_status.append("❌ essentia: NO disponible")
-
-        try:
-            import madmom  # noqa: F401
-            libs_status.append("✅ madmom: Disponible (recomendado para BPM)")
-        except ImportError:
-            libs_status.append("⚠️ madmom: NO disponible (opcional pero recomendado)")
-
-        try:
-            import matplotlib  # noqa: F401
-            libs_status.append("✅ matplotlib: Disponible")
-        except ImportError:
-            libs_status.append("❌ matplotlib: NO disponible")
+        # Verificar librerías principales (resultado cacheado en _DEPS)
+        libs_status.append("✅ librosa: Disponible" if _DEPS['librosa']
+                           else "❌ librosa: NO disponible")
+        libs_status.append("✅ essentia: Disponible" if _DEPS['essentia']
+                           else "❌ essentia: NO disponible")
+        libs_status.append("✅ madmom: Disponible (recomendado para BPM)" if _DEPS['madmom']
+                           else "⚠️ madmom: NO disponible (opcional pero recomendado)")
+        libs_status.append("✅ matplotlib: Disponible" if _DEPS['matplotlib']
+                           else "❌ matplotlib: NO disponible")
         
         # Verificar analizador principal
         if ANALYZER_AVAILABLE:
@@ -823,16 +1204,23 @@ Método Key: {key_data['method']}"""
             libs_status.append("❌ music_analyzer: NO disponible")
         
         # Actualizar display
-        libs_text = "\n".join(libs_status)
-        libs_text += "\n\nPara instalar las dependencias faltantes:\n"
-        libs_text += "pip install librosa essentia-tensorflow madmom matplotlib scipy soundfile\n\n"
-        libs_text += "Nota: madmom es opcional pero proporciona mejor precisión en BPM\n"
-        libs_text += "para canciones con tempo variable."
+        libs_text = (
+            "\n".join(libs_status)
+            + "\n\nPara instalar las dependencias faltantes:\n"
+            "pip install librosa essentia-tensorflow madmom matplotlib scipy soundfile\n\n"
+            "Nota: madmom es opcional pero proporciona mejor precisión en BPM\n"
+            "para canciones con tempo variable."
+        )
         
-        self.libs_text.config(state='normal')
-        self.libs_text.delete(1.0, tk.END)
-        self.libs_text.insert(tk.END, libs_text)
-        self.libs_text.config(state='disabled')
+        self._set_text(self.libs_text, libs_text)
+    
+    def rescan_dependencies(self):
+        """Descartar la comprobación cacheada y volver a buscar las librerías"""
+        # Sin esto, importlib no vería paquetes instalados después de arrancar
+        importlib.invalidate_caches()
+        _DEPS.clear()
+        _DEPS.update(_probe_dependencies())
+        self.check_dependencies()
     
     def show_help(self):
         """Mostrar ventana de ayuda"""
@@ -962,10 +1350,9 @@ def main():
     # Configurar cierre de aplicación
     def on_closing():
         if app.is_analyzing:
-            if messagebox.askyesno("Confirmación", "Hay un análisis en curso. ¿Deseas salir?"):
-                root.destroy()
-        else:
-            root.destroy()
+            if not messagebox.askyesno("Confirmación", "Hay un análisis en curso. ¿Deseas salir?"):
+                return
+        root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
     
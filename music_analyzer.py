@@ -16,11 +16,109 @@ If an error occurs, a dictionary containing the keys ``error`` and
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import partial
+import multiprocessing as mp
 import os
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
-# Optional imports – we try to import lazily inside methods to allow the
-# module to be imported even when the heavy dependencies are missing.
+import numpy as np
+
+from _kernels import silence_runs
+
+# librosa is heavy to import: it is loaded lazily through _get_librosa() so
+# the module can be imported even when librosa is missing.
+
+
+# Analysis grid shared by every feature (STFT, onsets, chroma, RMS)
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+# Krumhansl-Schmuckler key profiles for C major / C minor
+MAJOR_PROFILE = (6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88)
+MINOR_PROFILE = (6.33, 2.68, 3.52, 5.38, 2.6, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17)
+
+# librosa, once imported by _get_librosa()
+_librosa = None
+
+
+def _get_librosa() -> Any:
+    """Import :mod:`librosa` on first use and keep the module at module scope."""
+
+    global _librosa
+    if _librosa is None:
+        import librosa
+
+        _librosa = librosa
+    return _librosa
+
+
+def _standardised_rotations(profile: Tuple[float, ...]) -> Any:
+    """Return the ``(12, 12)`` matrix of all rotations of ``profile``.
+
+    The profile is standardised (zero mean, unit variance) and row ``i``
+    is the profile rolled by ``i`` semitones, so a matrix-vector product
+    against a standardised chroma vector yields the Pearson correlation
+    with every tonic at once.
+    """
+
+    p = np.asarray(profile)
+    p = (p - p.mean()) / p.std()
+    return np.stack([np.roll(p, i) for i in range(12)])
+
+
+# Rotation templates of both profiles, interleaved major/minor per tonic
+# (row ``2 * i`` is major, ``2 * i + 1`` minor) so the best row index
+# decodes directly into ``(tonic, is_minor)``.
+_KEY_TEMPLATES = np.stack(
+    [_standardised_rotations(MAJOR_PROFILE), _standardised_rotations(MINOR_PROFILE)], axis=1
+).reshape(24, 12)
+
+
+def _estimate_key(chroma_mean: Any) -> Tuple[str, str, float]:
+    """Krumhansl-Schmuckler key estimate for a 12-bin mean chroma vector.
+
+    Returns ``(key, scale, confidence)`` where ``confidence`` is the
+    Pearson correlation of the winning profile, clipped to ``[0, 1]``.
+    """
+
+    # Standardise and fold the 1/12 of the correlation mean into a single
+    # scale factor, so the 24 scores need no further division.
+    inv_norm = 1.0 / (12 * (chroma_mean.std() + 1e-9))
+    c = (chroma_mean - chroma_mean.mean()) * inv_norm
+
+    # Interleaving keeps the tie-breaking order major/minor per tonic.
+    scores = _KEY_TEMPLATES @ c
+    best = int(scores.argmax())
+    best_key, is_minor = divmod(best, 2)
+    return NOTE_NAMES[best_key], "minor" if is_minor else "major", max(0.0, float(scores[best]))
+
+
+def _silence_segments(
+    silent_mask: Any,
+    sr: int,
+    min_samples: int,
+    hop_length: int = 1,
+    n_samples: Optional[int] = None,
+) -> List[Tuple[float, float, float]]:
+    """Return ``(start, end, duration)`` runs of ``True`` in ``silent_mask``.
+
+    ``silent_mask`` holds one flag per frame of ``hop_length`` samples
+    (``1`` for a per-sample mask).  Runs are located by
+    :func:`_kernels.silence_runs`, JIT-compiled when numba is available.
+    With centred frames the last frame reaches past the signal, so run
+    boundaries are clamped to ``n_samples`` when it is given.  Times are
+    in seconds; runs shorter than ``min_samples`` samples are discarded.
+    """
+
+    starts, ends = silence_runs(silent_mask)
+    starts, ends = starts * hop_length, ends * hop_length
+    if n_samples is not None:
+        starts, ends = np.minimum(starts, n_samples), np.minimum(ends, n_samples)
+    keep = (ends - starts) >= min_samples
+    starts, ends = starts[keep], ends[keep]
+    return list(zip((starts / sr).tolist(), (ends / sr).tolist(), ((ends - starts) / sr).tolist()))
 
 
 @dataclass
@@ -40,10 +138,26 @@ class MusicAnalyzer:
     min_silence_duration:
         Minimum duration in seconds for a silence segment to be
         reported.
+    target_sr:
+        Sample rate the audio is resampled to before analysis.  Tempo,
+        key and silence estimates do not need the native rate, and
+        halving it halves every downstream FFT.  ``None`` keeps the
+        file's native rate.
     """
 
     silence_threshold: float = -40.0
     min_silence_duration: float = 0.5
+    target_sr: Optional[int] = 22050
+
+    @property
+    def silence_threshold_amp(self) -> Any:
+        """``silence_threshold`` as a float32 linear amplitude ratio.
+
+        Derived from the field on access, so it follows any change to
+        ``silence_threshold``.
+        """
+
+        return np.float32(10.0 ** (self.silence_threshold / 20.0))
 
     # ------------------------------------------------------------------
     def analyze_song(self, file_path: str, *, verbose: bool = False) -> Dict[str, Any]:
@@ -65,93 +179,108 @@ class MusicAnalyzer:
             return {"error": f"Archivo no encontrado: {file_path}", "file_path": file_path}
 
         try:
-            import librosa
-            import numpy as np
+            librosa = _get_librosa()
         except Exception as exc:  # pragma: no cover - import errors
             return {"error": f"Dependencias faltantes: {exc}", "file_path": file_path}
 
         try:
             # Load audio using librosa in mono to simplify analysis
-            y, sr = librosa.load(file_path, sr=None, mono=True)
+            y, sr = librosa.load(file_path, sr=self.target_sr, mono=True)
+            # librosa already returns contiguous float32; this is a no-op then,
+            # and otherwise guarantees the layout every vectorised pass expects.
+            y = np.ascontiguousarray(y, dtype=np.float32)
+            # Peak-normalise so beat tracking does not depend on the level
+            y = librosa.util.normalize(y)
             duration = float(librosa.get_duration(y=y, sr=sr))
-            audio_info = {"sample_rate": int(sr), "samples": int(len(y))}
+            # ``sample_rate``/``samples`` describe the file itself; the
+            # analysis ran on the (possibly resampled) signal at
+            # ``analysis_sample_rate``, which is what frame times refer to.
+            if self.target_sr is None:
+                native_sr, native_samples = sr, len(y)
+            else:
+                native_sr = librosa.get_samplerate(file_path)
+                native_samples = round(librosa.get_duration(path=file_path) * native_sr)
+            audio_info = {
+                "sample_rate": int(native_sr),
+                "samples": int(native_samples),
+                "analysis_sample_rate": int(sr),
+                "analysis_samples": int(len(y)),
+            }
+
+            # One STFT feeds every feature below: onsets/beats, chroma and RMS
+            S = np.abs(librosa.stft(y, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH))
+            # Frame-level RMS for the silence analysis is taken from the
+            # magnitude before it is squared in place into the power
+            # spectrogram, so only one spectrogram-sized buffer is kept.
+            rms = librosa.feature.rms(S=S, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+            S_power = np.square(S, out=S)
 
             # ---- BPM analysis -------------------------------------------------
-            tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+            # Same novelty function beat_track computes from ``y`` (median-
+            # aggregated flux of the log-power mel spectrogram), but built
+            # from the shared STFT, so tempo and beats match beat_track(y=y).
+            mel = librosa.feature.melspectrogram(S=S_power, sr=sr)
+            onset_env = librosa.onset.onset_strength(
+                S=librosa.power_to_db(mel), sr=sr, aggregate=np.median
+            )
+            tempo, beats = librosa.beat.beat_track(
+                onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH
+            )
+            # Recent librosa versions return the tempo as a 1-element array
+            tempo = float(np.atleast_1d(tempo)[0])
             bpm_analysis = {
-                "bpm": float(tempo),
+                "bpm": tempo,
                 "confidence": 1.0,  # librosa does not provide confidence
                 "method": "librosa.beat.beat_track",
                 "tempo_stability": None,
                 "beats_detected": int(len(beats)),
-                "beats": beats.tolist(),
+                "beats": beats.astype(np.int32),
+                # Novelty function used by beat_track, reusable for onset plots
+                "onset_envelope": onset_env.astype(np.float32),
                 "all_estimates": [
-                    {"bpm": float(tempo), "confidence": 1.0, "method": "librosa"}
+                    {"bpm": tempo, "confidence": 1.0, "method": "librosa"}
                 ],
             }
 
             # ---- Key analysis -------------------------------------------------
-            chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+            # STFT-based chroma is much cheaper than the constant-Q transform
+            # and just as good for a time-averaged key estimate.
+            chroma = librosa.feature.chroma_stft(S=S_power, sr=sr)
             chroma_mean = chroma.mean(axis=1)
 
-            # Simple template matching using major/minor profiles
-            major_template = np.array(
-                [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
-            )
-            minor_template = np.array(
-                [6.33, 2.68, 3.52, 5.38, 2.6, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
-            )
-
-            note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-            best_key = 0
-            best_scale = "major"
-            best_score = -float("inf")
-            for i in range(12):
-                maj_score = np.roll(major_template, i).dot(chroma_mean)
-                min_score = np.roll(minor_template, i).dot(chroma_mean)
-                if maj_score > best_score:
-                    best_score = maj_score
-                    best_key = i
-                    best_scale = "major"
-                if min_score > best_score:
-                    best_score = min_score
-                    best_key = i
-                    best_scale = "minor"
+            # Template matching (Pearson correlation) against key profiles
+            key_name, scale, key_confidence = _estimate_key(chroma_mean)
 
             key_analysis = {
-                "key": note_names[best_key],
-                "scale": best_scale,
-                "confidence": float(best_score / chroma_mean.sum())
-                if chroma_mean.sum() > 0
-                else 0.0,
+                "key": key_name,
+                "scale": scale,
+                "confidence": key_confidence,
                 "method": "template_matching",
                 "key_stability": None,
                 "key_changes_detected": False,
-                "chromagram": chroma.tolist(),
+                # Compact array; converted to lists only when exported
+                "chromagram": chroma.astype(np.float16),
             }
 
             # ---- Silence analysis ---------------------------------------------
-            amplitude = np.abs(y)
-            # Convert dB threshold to linear amplitude
-            threshold_amp = 10 ** (self.silence_threshold / 20.0)
+            # Frames more than ``silence_threshold`` dB below the loudest one
+            # are silent.  This approximates
+            # librosa.effects.split(top_db=-silence_threshold): split() frames
+            # the raw waveform, whereas this RMS comes from the Hann-windowed
+            # shared STFT, so run boundaries can differ by about one hop
+            # (~23 ms).  Ends are clamped to the signal length in both.  The
+            # comparison is done on linear amplitudes against a float32
+            # ratio, so no per-frame dB conversion is needed.
             min_samples = int(self.min_silence_duration * sr)
-
-            silent_mask = amplitude < threshold_amp
-            segments: List[Tuple[float, float, float]] = []
-            start = None
-            for idx, is_silent in enumerate(silent_mask):
-                if is_silent and start is None:
-                    start = idx
-                elif not is_silent and start is not None:
-                    if idx - start >= min_samples:
-                        segments.append(
-                            (start / sr, idx / sr, (idx - start) / sr)
-                        )
-                    start = None
-            if start is not None and len(silent_mask) - start >= min_samples:
-                segments.append(
-                    (start / sr, len(silent_mask) / sr, (len(silent_mask) - start) / sr)
-                )
+            peak = rms.max()
+            if peak > 0:
+                silent_frames = rms < peak * self.silence_threshold_amp
+            else:
+                # Digital silence: there is no reference level, the whole file is silent
+                silent_frames = np.ones_like(rms, dtype=bool)
+            segments = _silence_segments(
+                silent_frames, sr, min_samples, hop_length=HOP_LENGTH, n_samples=len(y)
+            )
 
             total_silence = float(sum(seg[2] for seg in segments))
             silence_analysis = {
@@ -189,9 +318,27 @@ def analyze_audio_file(file_path: str, **kwargs: Any) -> Dict[str, Any]:
         analyzer.silence_threshold = float(kwargs["silence_threshold"])
     if "min_silence_duration" in kwargs:
         analyzer.min_silence_duration = float(kwargs["min_silence_duration"])
+    if "target_sr" in kwargs:
+        analyzer.target_sr = kwargs["target_sr"]
 
     verbose = bool(kwargs.get("verbose", False))
     return analyzer.analyze_song(file_path, verbose=verbose)
 
 
-__all__ = ["MusicAnalyzer", "analyze_audio_file"]
+def analyze_audio_files(
+    paths: Iterable[str], *, processes: Optional[int] = None, **kwargs: Any
+) -> List[Dict[str, Any]]:
+    """Analyse several files in parallel, one worker process per core.
+
+    Each path is handled by :func:`analyze_audio_file` with ``kwargs``.
+    Results are returned in completion order (every dictionary carries
+    its ``file_path``).  Callers on Windows/macOS must invoke this from
+    under an ``if __name__ == "__main__":`` guard, as required by
+    :mod:`multiprocessing`.
+    """
+
+    with mp.Pool(processes=processes) as pool:
+        return list(pool.imap_unordered(partial(analyze_audio_file, **kwargs), paths))
+
+
+__all__ = ["MusicAnalyzer", "analyze_audio_file", "analyze_audio_files"]
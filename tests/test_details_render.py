@@ -34,12 +34,20 @@ class DummyVar:
 def _make_app():
     app = MusicAnalyzerGUI.__new__(MusicAnalyzerGUI)
     app.details_text = DummyText()
+    app._details_cache = None
+    app._cached_basename = "dummy.wav"
+    app._cached_analysis_ts = "2024-01-01 00:00:00"
     app.silence_threshold_var = DummyVar(-40)
     app.min_silence_var = DummyVar(0.5)
     app.analysis_results = {
         "file_path": "dummy.wav",
         "duration": 1.23,
-        "audio_info": {"sample_rate": 44100, "samples": 12345},
+        "audio_info": {
+            "sample_rate": 44100,
+            "samples": 12345,
+            "analysis_sample_rate": 22050,
+            "analysis_samples": 6173,
+        },
         "bpm_analysis": {
             "bpm": 120.0,
             "confidence": 0.9,
@@ -73,3 +81,19 @@ def test_update_details_display_renders_without_error():
     app.update_details_display()
     content = app.details_text.get()
     assert "=== ANÁLISIS BPM ===" in content
+
+
+def test_update_details_display_reuses_cached_text():
+    app = _make_app()
+    app.update_details_display()
+    first = app.details_text.get()
+    cached = app._details_cache
+
+    app.update_details_display()
+    assert app._details_cache is cached
+    assert app.details_text.get() == first
+
+    app.min_silence_var = DummyVar(1.0)
+    app.update_details_display()
+    assert app._details_cache is not cached
+    assert "Duración mínima: 1.0 segundos" in app.details_text.get()
@@ -0,0 +1,162 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import _kernels
+from music_analyzer import (
+    MAJOR_PROFILE,
+    MINOR_PROFILE,
+    MusicAnalyzer,
+    _estimate_key,
+    _silence_segments,
+    analyze_audio_file,
+    analyze_audio_files,
+)
+
+
+def _loop_segments(mask, sr, min_samples):
+    segments = []
+    start = None
+    for idx, is_silent in enumerate(mask):
+        if is_silent and start is None:
+            start = idx
+        elif not is_silent and start is not None:
+            if idx - start >= min_samples:
+                segments.append((start / sr, idx / sr, (idx - start) / sr))
+            start = None
+    if start is not None and len(mask) - start >= min_samples:
+        segments.append((start / sr, len(mask) / sr, (len(mask) - start) / sr))
+    return segments
+
+
+def test_silence_segments_matches_sample_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        mask = rng.random(500) < 0.7
+        assert _silence_segments(mask, 100, 3) == _loop_segments(mask, 100, 3)
+
+
+def test_silence_segments_edges():
+    assert _silence_segments(np.zeros(10, dtype=bool), 10, 1) == []
+    assert _silence_segments(np.ones(10, dtype=bool), 10, 1) == [(0.0, 1.0, 1.0)]
+    mask = np.array([1, 1, 0, 1, 1, 1, 0, 0], dtype=bool)
+    assert _silence_segments(mask, 1, 3) == [(3.0, 6.0, 3.0)]
+
+
+def test_silence_segments_frame_mask():
+    mask = np.array([0, 1, 1, 1, 0, 1], dtype=bool)
+    assert _silence_segments(mask, 8, 12, hop_length=4) == [(0.5, 2.0, 1.5)]
+
+
+def test_silence_segments_clamped_to_signal_length():
+    mask = np.array([0, 0, 1, 1], dtype=bool)
+    assert _silence_segments(mask, 4, 1, hop_length=4, n_samples=14) == [(2.0, 3.5, 1.5)]
+
+
+def test_silence_run_kernels_agree():
+    rng = np.random.default_rng(2)
+    for n in (0, 1, 7, 500):
+        mask = rng.random(n) < 0.5
+        loop_starts, loop_ends = _kernels._silence_runs_loop(mask)
+        np_starts, np_ends = _kernels._silence_runs_numpy(mask)
+        assert loop_starts.tolist() == np_starts.tolist()
+        assert loop_ends.tolist() == np_ends.tolist()
+
+
+def test_silence_threshold_amp_follows_threshold():
+    analyzer = MusicAnalyzer(silence_threshold=-20.0)
+    assert analyzer.silence_threshold_amp.dtype == np.float32
+    assert np.isclose(analyzer.silence_threshold_amp, 0.1)
+    analyzer.silence_threshold = -40.0
+    assert np.isclose(analyzer.silence_threshold_amp, 0.01)
+
+
+def test_estimate_key_finds_rotated_profile():
+    key, scale, confidence = _estimate_key(np.roll(np.array(MAJOR_PROFILE), 7))
+    assert (key, scale) == ("G", "major")
+    assert np.isclose(confidence, 1.0)
+
+    key, scale, confidence = _estimate_key(np.roll(np.array(MINOR_PROFILE), 9))
+    assert (key, scale) == ("A", "minor")
+    assert np.isclose(confidence, 1.0)
+
+
+def test_estimate_key_scores_are_correlations():
+    chroma_mean = np.random.default_rng(1).random(12)
+    _, _, confidence = _estimate_key(chroma_mean)
+    best = max(
+        np.corrcoef(np.roll(profile, i), chroma_mean)[0, 1]
+        for profile in (MAJOR_PROFILE, MINOR_PROFILE)
+        for i in range(12)
+    )
+    assert np.isclose(confidence, max(best, 0.0), atol=1e-6)
+
+
+def test_analyze_audio_file_on_synthetic_track(tmp_path):
+    pytest.importorskip("librosa")
+    sf = pytest.importorskip("soundfile")
+
+    sr = 22050
+    t = np.arange(8 * sr) / sr
+    # A4 tone gated at 2 Hz (120 BPM) with one second of silence
+    y = 0.5 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 2 * t) > 0)
+    y[3 * sr:4 * sr] = 0
+    path = tmp_path / "tone.wav"
+    sf.write(path, y.astype(np.float32), sr)
+
+    results = analyze_audio_file(str(path))
+
+    assert "error" not in results
+    assert 100 <= results["bpm_analysis"]["bpm"] <= 140
+    assert results["key_analysis"]["key"] == "A"
+    assert results["key_analysis"]["chromagram"].dtype == np.float16
+    assert results["bpm_analysis"]["onset_envelope"].dtype == np.float32
+    assert results["bpm_analysis"]["beats"].dtype == np.int32
+    assert results["silence_analysis"]["segments_found"] == 1
+    start, end, _ = results["silence_analysis"]["segments"][0]
+    assert 2.5 < start < 3.1 and 3.9 < end < 4.1
+
+
+def test_analyze_audio_files_returns_one_result_per_path(tmp_path):
+    paths = [str(tmp_path / "a.wav"), str(tmp_path / "b.wav")]
+    results = analyze_audio_files(paths, processes=2)
+    assert sorted(r["file_path"] for r in results) == paths
+    assert all("error" in r for r in results)
+
+
+@pytest.mark.parametrize("trailing", [False, True])
+def test_analyze_audio_file_silence_ends_within_file(tmp_path, trailing):
+    pytest.importorskip("librosa")
+    sf = pytest.importorskip("soundfile")
+
+    sr = 22050
+    y = np.zeros(5 * sr, dtype=np.float32)
+    if trailing:
+        # Tone for the first half, then silence to the end of the file
+        y[: 5 * sr // 2] = 0.5 * np.sin(2 * np.pi * 440 * np.arange(5 * sr // 2) / sr)
+    path = tmp_path / "silence.wav"
+    sf.write(path, y, sr)
+
+    results = analyze_audio_file(str(path))
+
+    segments = results["silence_analysis"]["segments"]
+    assert len(segments) == 1
+    assert segments[0][1] == pytest.approx(5.0)
+    if not trailing:
+        assert segments[0][0] == 0.0
+
+
+def test_analyze_audio_file_reports_native_sample_rate(tmp_path):
+    pytest.importorskip("librosa")
+    sf = pytest.importorskip("soundfile")
+
+    path = tmp_path / "native.wav"
+    sf.write(path, np.zeros(44100, dtype=np.float32), 44100)
+
+    audio_info = analyze_audio_file(str(path))["audio_info"]
+
+    assert (audio_info["sample_rate"], audio_info["samples"]) == (44100, 44100)
+    assert (audio_info["analysis_sample_rate"], audio_info["analysis_samples"]) == (22050, 22050)
@@ -0,0 +1,86 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from auto_hear import VIZ_HOP_LENGTH, VIZ_MAX_COLUMNS, VIZ_SR, MusicAnalyzerGUI
+
+RESULTS = {"bpm_analysis": {}, "audio_info": {"analysis_sample_rate": 22050}}
+
+
+def _make_app():
+    app = MusicAnalyzerGUI.__new__(MusicAnalyzerGUI)
+    app._y = None
+    app._sr = None
+    app._stft_power = None
+    app._viz_cache = OrderedDict()
+    app._viz_generation = 0
+    app._viz_lock = threading.Lock()
+    app._viz_busy = True
+    app._viz_pending = False
+    return app
+
+
+def _write_tone(path, seconds):
+    sf = pytest.importorskip("soundfile")
+    t = np.arange(int(seconds * VIZ_SR)) / VIZ_SR
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440 * t), VIZ_SR)
+    return str(path)
+
+
+def test_stale_viz_job_does_not_leak_previous_audio(tmp_path):
+    pytest.importorskip("librosa")
+    old = _write_tone(tmp_path / "old.wav", 1.0)
+    new = _write_tone(tmp_path / "new.wav", 2.0)
+    app = _make_app()
+
+    # The file changes before a job for the old one starts: nothing is decoded
+    app._viz_generation = 1
+    app._load_viz_audio = lambda path: pytest.fail("stale job must not decode")
+    stale = app._compute_viz("chromagram", old, RESULTS, 0)
+    assert "error" not in stale
+    assert app._y is None and app._stft_power is None and not app._viz_cache
+    del app._load_viz_audio
+
+    fresh = app._compute_viz("chromagram", new, RESULTS, 1)
+    assert np.isclose(fresh["duration"], 2.0)
+    assert np.isclose(len(app._y) / app._sr, 2.0)
+
+    # The stale result is dropped instead of replacing the placeholder
+    app._ensure_plot = lambda: pytest.fail("stale data must not be drawn")
+    app._render_viz(stale)
+    assert app._viz_busy is False
+
+
+def test_viz_job_stops_when_file_changes_during_decode(tmp_path):
+    pytest.importorskip("librosa")
+    old = _write_tone(tmp_path / "old.wav", 1.0)
+    app = _make_app()
+    load = app._load_viz_audio
+
+    def load_then_change_file(path):
+        audio = load(path)
+        app._viz_generation += 1
+        return audio
+
+    app._load_viz_audio = load_then_change_file
+    stale = app._compute_viz("chromagram", old, RESULTS, 0)
+    assert "chroma" not in stale
+    assert app._y is None and not app._viz_cache
+
+
+def test_chromagram_is_decimated_to_at_most_max_columns(tmp_path):
+    pytest.importorskip("librosa")
+    # Just under twice the cap: a floor-division step of 1 would keep them all
+    frames = 2 * VIZ_MAX_COLUMNS - 1
+    path = _write_tone(tmp_path / "long.wav", (frames - 1) * VIZ_HOP_LENGTH / VIZ_SR)
+    app = _make_app()
+
+    data = app._compute_viz("chromagram", path, RESULTS, 0)
+
+    assert app._stft_power.shape[1] == frames
+    assert data["chroma"].shape[1] <= VIZ_MAX_COLUMNS